@@ -6,17 +6,120 @@ Perfect for IFS Junior AI Engineer application
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
 import json
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+import email.policy
+from email.message import EmailMessage
+from datetime import date, datetime, timedelta
 import logging
-from typing import Dict, List
+import logging.handlers
+import queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 import os
-from dataclasses import dataclass
+import pickle
+import signal
+import sys
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
 
-@dataclass
+try:
+    import ijson
+except ImportError:  # optional: stream Sheets responses instead of decoding them whole
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional: faster encoding for checklist and metrics files
+    orjson = None
+
+
+def _json_bytes(obj, indent: bool = False) -> bytes:
+    """Serialize obj to JSON bytes, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    # Match orjson's output byte-for-byte so append-only files stay uniform
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# Root logging is shared by every OnboardingAssistant in the process: log calls only
+# enqueue records and one background listener does the file/console I/O
+_log_lock = threading.Lock()
+_log_listener = None
+_log_queue_handler = None
+_log_owners = 0
+# logging.logThreads/logProcesses as they were before we installed the listener
+_log_saved_flags = None
+
+
+def _acquire_log_listener():
+    """Install the queue-backed root handler once and register another owner"""
+    global _log_listener, _log_queue_handler, _log_owners, _log_saved_flags
+    with _log_lock:
+        _log_owners += 1
+        root = logging.getLogger()
+        if _log_listener is not None or root.handlers:
+            # Already installed, or logging was configured elsewhere
+            return
+        
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [
+            logging.FileHandler('onboarding.log'),
+            logging.StreamHandler()
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        _log_listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _log_listener.start()
+        
+        _log_queue_handler = logging.handlers.QueueHandler(log_queue)
+        # Our format uses neither field, so skip the per-record lookups while we own it
+        _log_saved_flags = (logging.logThreads, logging.logProcesses)
+        logging.logThreads = False
+        logging.logProcesses = False
+        root.setLevel(logging.INFO)
+        root.addHandler(_log_queue_handler)
+
+
+def _release_log_listener():
+    """Drop one owner, flushing and removing the listener after the last one"""
+    global _log_owners
+    with _log_lock:
+        _log_owners = max(_log_owners - 1, 0)
+        if _log_owners == 0:
+            _stop_log_listener()
+
+
+def _stop_log_listener():
+    """Flush queued records and uninstall the root queue handler"""
+    global _log_listener, _log_queue_handler, _log_saved_flags
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    logging.getLogger().removeHandler(_log_queue_handler)
+    for handler in _log_listener.handlers:
+        handler.close()
+    logging.logThreads, logging.logProcesses = _log_saved_flags
+    _log_listener = None
+    _log_queue_handler = None
+    _log_saved_flags = None
+
+
+# The listener thread is a daemon; flush whatever is still queued at exit
+atexit.register(_stop_log_listener)
+
+@dataclass(slots=True, frozen=True)
 class Employee:
     name: str
     email: str
@@ -24,22 +127,112 @@ class Employee:
     start_date: str
     manager: str
 
+@dataclass(slots=True)
+class EmployeeTable:
+    names: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    departments: List[str] = field(default_factory=list)
+    start_dates: List[str] = field(default_factory=list)
+    managers: List[str] = field(default_factory=list)
+    
+    def append(self, name: str, email: str, department: str, start_date: str, manager: str):
+        """Add one employee's fields to the column lists"""
+        self.names.append(name)
+        self.emails.append(email)
+        self.departments.append(department)
+        self.start_dates.append(start_date)
+        self.managers.append(manager)
+    
+    @classmethod
+    def from_employees(cls, employees: Iterable[Employee]) -> 'EmployeeTable':
+        """Build a table from Employee records"""
+        table = cls()
+        for employee in employees:
+            table.append(
+                name=employee.name,
+                email=employee.email,
+                department=employee.department,
+                start_date=employee.start_date,
+                manager=employee.manager
+            )
+        return table
+    
+    def where(self, predicate: Callable[[Employee], bool]) -> 'EmployeeTable':
+        """Return a new table with the employees matching predicate"""
+        return EmployeeTable.from_employees(employee for employee in self if predicate(employee))
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __iter__(self) -> Iterator[Employee]:
+        """Build Employee records on demand from the column lists"""
+        for values in zip(self.names, self.emails, self.departments, self.start_dates, self.managers):
+            yield Employee(*values)
+
 class OnboardingAssistant:
+    # (connect, read) timeouts in seconds for outbound HTTP calls
+    HTTP_TIMEOUT = (3.05, 10)
+    # Upper bound on employees processed concurrently
+    MAX_WORKERS = 8
+    # Conditional-GET cache for the Sheets response
+    CACHE_DIR = '.onboarding_cache'
+    # Bump when the pickled cache layout changes so older caches are discarded
+    CACHE_VERSION = 1
+    
+    # Slack recommends no more than 20 attachments per message
+    SLACK_MAX_ATTACHMENTS = 20
+    # Slack attachment JSON with %s slots for the JSON-encoded field values
+    SLACK_ATTACHMENT_TPL = json.dumps({
+        "color": "good",
+        "fields": [
+            {"title": title, "value": "%s", "short": True}
+            for title in ("Name", "Department", "Start Date", "Manager")
+        ]
+    }, separators=(',', ':')).replace('"%s"', '%s').encode('utf-8')
+    
+    # Welcome email template, filled with Employee fields per message
+    WELCOME_HTML = """
+        <html>
+        <body>
+            <h2>Welcome to Our Team, {name}!</h2>
+            
+            <p>We're excited to have you join the <strong>{department}</strong> department.</p>
+            
+            <h3>Your Details:</h3>
+            <ul>
+                <li><strong>Start Date:</strong> {start_date}</li>
+                <li><strong>Department:</strong> {department}</li>
+                <li><strong>Manager:</strong> {manager}</li>
+            </ul>
+            
+            <h3>Next Steps:</h3>
+            <ol>
+                <li>Your manager will contact you within 24 hours</li>
+                <li>HR will send you onboarding documents</li>
+                <li>IT will setup your accounts and equipment</li>
+            </ol>
+            
+            <p>If you have any questions, please don't hesitate to reach out!</p>
+            
+            <p>Best regards,<br>
+            HR Team</p>
+        </body>
+        </html>
+        """
+    
     def __init__(self):
         """Initialize the onboarding assistant with API configurations"""
         self.setup_logging()
         self.config = self.load_config()
+        self.session = self.create_http_session()
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+        self._keep_smtp_open = False
         
     def setup_logging(self):
         """Configure logging for monitoring workflow execution"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('onboarding.log'),
-                logging.StreamHandler()
-            ]
-        )
+        _acquire_log_listener()
+        self._owns_log_listener = True
         self.logger = logging.getLogger(__name__)
         
     def load_config(self) -> Dict:
@@ -49,69 +242,267 @@ class OnboardingAssistant:
             'gmail_password': os.getenv('GMAIL_APP_PASSWORD', 'your_app_password'),
             'slack_webhook': os.getenv('SLACK_WEBHOOK', 'https://hooks.slack.com/your_webhook'),
             'google_sheets_id': os.getenv('SHEETS_ID', 'your_sheet_id'),
-            'sheets_api_key': os.getenv('SHEETS_API_KEY', 'your_api_key')
+            'sheets_api_key': os.getenv('SHEETS_API_KEY', 'your_api_key'),
+            'sheet_ranges': [
+                sheet_range.strip()
+                for sheet_range in os.getenv('SHEETS_RANGES', 'Sheet1!A:E').split(',')
+                if sheet_range.strip()
+            ]
         }
     
-    def fetch_new_employees(self) -> List[Employee]:
+    def create_http_session(self) -> requests.Session:
+        """Create a pooled HTTP session shared by the Sheets and Slack calls"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        """Release pooled connections and flush pending log records"""
+        self._close_smtp()
+        self.session.close()
+        if self._owns_log_listener:
+            self._owns_log_listener = False
+            _release_log_listener()
+    
+    def fetch_new_employees(self) -> EmployeeTable:
         """Fetch new employee data from Google Sheets API"""
         try:
-            # Google Sheets API endpoint
-            url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.config['google_sheets_id']}/values/Sheet1!A:E"
-            params = {'key': self.config['sheets_api_key']}
+            # Google Sheets API endpoint - one round-trip for every configured range
+            url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.config['google_sheets_id']}/values:batchGet"
+            params = [('ranges', sheet_range) for sheet_range in self.config['sheet_ranges']]
+            params.append(('key', self.config['sheets_api_key']))
             
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            today = date.today()
             
-            data = response.json()
-            employees = []
+            # Revalidate the previous response; the cached rows were filtered for today only
+            cache = self._load_sheet_cache(today)
+            headers = {'If-None-Match': cache['etag']} if cache else {}
             
-            # Skip header row, process employee data
-            for row in data.get('values', [])[1:]:
-                if len(row) >= 5 and self.is_new_employee(row[3]):  # Check start date
-                    employee = Employee(
-                        name=row[0],
-                        email=row[1],
-                        department=row[2],
-                        start_date=row[3],
-                        manager=row[4]
-                    )
-                    employees.append(employee)
+            with self.session.get(url, params=params, headers=headers,
+                                  timeout=self.HTTP_TIMEOUT, stream=True) as response:
+                if cache and response.status_code == 304:
+                    self.logger.info("Sheet unchanged since last fetch, using cached employees")
+                    employees = cache['employees']
+                else:
+                    response.raise_for_status()
+                    
+                    employees = EmployeeTable()
+                    
+                    # Zero-padded ISO dates order lexically, so a string range check
+                    # rejects most rows before any date parsing; header rows never fall
+                    # inside it. Other date spellings go straight to is_new_employee.
+                    window_start = today.isoformat()
+                    window_end = (today + timedelta(days=7)).isoformat()
+                    
+                    for row in self._iter_sheet_rows(response):
+                        if (len(row) >= 5
+                                and (len(row[3]) != 10 or window_start <= row[3] <= window_end)
+                                and self.is_new_employee(row[3], today)):  # Check start date
+                            employees.append(
+                                name=row[0],
+                                email=row[1],
+                                department=row[2],
+                                start_date=row[3],
+                                manager=row[4]
+                            )
+                    
+                    if response.headers.get('ETag'):
+                        self._save_sheet_cache(response.headers['ETag'], today, employees)
             
             self.logger.info(f"Found {len(employees)} new employees")
             return employees
             
         except Exception as e:
             self.logger.error(f"Error fetching employees: {str(e)}")
-            return []
+            return EmployeeTable()
     
-    def is_new_employee(self, start_date: str) -> bool:
+    def _sheet_cache_key(self) -> Dict:
+        """Identify the cache format and the sheet ranges it was fetched from"""
+        return {
+            'version': self.CACHE_VERSION,
+            'sheet_id': self.config['google_sheets_id'],
+            'ranges': list(self.config['sheet_ranges'])
+        }
+    
+    def _load_sheet_cache(self, today: date) -> Optional[Dict]:
+        """Load the cached Sheets ETag and employees if they were stored today"""
+        try:
+            with open(os.path.join(self.CACHE_DIR, 'sheets.pkl'), 'rb') as f:
+                cache = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError,
+                ImportError, TypeError, ValueError):
+            return None
+        
+        if (not isinstance(cache, dict)
+                or cache.get('key') != self._sheet_cache_key()
+                or cache.get('date') != today
+                or not isinstance(cache.get('employees'), EmployeeTable)):
+            return None
+        return cache
+    
+    def _save_sheet_cache(self, etag: str, today: date, employees: EmployeeTable):
+        """Persist the Sheets ETag and filtered employees for the next run"""
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            path = os.path.join(self.CACHE_DIR, 'sheets.pkl')
+            cache = {
+                'key': self._sheet_cache_key(),
+                'etag': etag,
+                'date': today,
+                'employees': employees
+            }
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(cache, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache Sheets response: {str(e)}")
+    
+    @staticmethod
+    def _ledger_key(employee: Employee) -> tuple:
+        """Identify an employee's onboarding in the processed ledger"""
+        return (employee.email, employee.start_date)
+    
+    def _load_processed_ledger(self) -> Dict[str, set]:
+        """Load which employees were already emailed and announced on Slack"""
+        try:
+            with open(os.path.join(self.CACHE_DIR, 'processed.json'), 'rb') as f:
+                entries = json.load(f)
+            if isinstance(entries, list):
+                # Earlier ledgers did not track the two steps separately
+                keys = {(email, start_date) for email, start_date in entries}
+                return {'emailed': keys, 'announced': set(keys)}
+            return {
+                step: {(email, start_date) for email, start_date in entries.get(step, [])}
+                for step in ('emailed', 'announced')
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {'emailed': set(), 'announced': set()}
+    
+    def _save_processed_ledger(self, ledger: Dict[str, set]):
+        """Persist the ledger, dropping employees whose start date has passed"""
+        today = date.today().isoformat()
+        entries = {
+            step: sorted(key for key in keys if key[1] >= today)
+            for step, keys in ledger.items()
+        }
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            path = os.path.join(self.CACHE_DIR, 'processed.json')
+            with open(path + '.tmp', 'wb') as f:
+                f.write(_json_bytes(entries))
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            self.logger.warning(f"Could not save processed employees: {str(e)}")
+    
+    def _iter_sheet_rows(self, response: requests.Response) -> Iterator[List[str]]:
+        """Yield rows from every value range, streaming the body when ijson is installed"""
+        if ijson is not None:
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, 'valueRanges.item.values.item')
+        else:
+            for value_range in response.json().get('valueRanges', []):
+                yield from value_range.get('values', [])
+    
+    def is_new_employee(self, start_date: str, today: date) -> bool:
         """Check if employee starts within next 7 days"""
         try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            today = datetime.now()
-            return 0 <= (start - today).days <= 7
+            start = date.fromisoformat(start_date)
         except ValueError:
+            # Sheets may hold dates without zero padding (2025-8-5)
+            try:
+                start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            except ValueError:
+                return False
+        return 0 <= (start - today).days <= 7
+    
+    def _smtp_connect(self) -> smtplib.SMTP:
+        """Open an authenticated Gmail SMTP connection"""
+        server = smtplib.SMTP('smtp.gmail.com', 587)
+        server.starttls()
+        server.login(self.config['gmail_user'], self.config['gmail_password'])
+        return server
+    
+    def _build_msg(self, employee: Employee) -> EmailMessage:
+        """Build the welcome email message for an employee"""
+        msg = EmailMessage(policy=email.policy.SMTP)
+        msg['From'] = self.config['gmail_user']
+        msg['To'] = employee.email
+        msg['Subject'] = f"Welcome to the team, {employee.name}!"
+        msg.set_content(self.generate_welcome_email_body(employee), subtype='html')
+        return msg
+    
+    @contextmanager
+    def _smtp_session(self):
+        """Hold one authenticated SMTP connection open for a batch of sends"""
+        if self._smtp is not None and not self._smtp_alive():
+            # A connection kept from an earlier run has gone stale
+            self._close_smtp()
+        
+        if self._smtp is None:
+            try:
+                self._smtp = self._smtp_connect()
+            except Exception as e:
+                self.logger.error(f"Error connecting to SMTP server: {str(e)}")
+        
+        try:
+            yield
+        finally:
+            # Long-running services keep the connection for the next run
+            if not self._keep_smtp_open:
+                self._close_smtp()
+    
+    def _smtp_alive(self) -> bool:
+        """Check that the kept SMTP connection still accepts commands"""
+        try:
+            code, _ = self._smtp.noop()
+        except (smtplib.SMTPException, OSError):
             return False
+        return code == 250
+    
+    def _close_smtp(self):
+        """Quit the shared SMTP connection if one is open"""
+        server, self._smtp = self._smtp, None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
     
     def send_welcome_email(self, employee: Employee) -> bool:
         """Send personalized welcome email using Gmail SMTP"""
         try:
-            # Create email content
-            subject = f"Welcome to the team, {employee.name}!"
-            body = self.generate_welcome_email_body(employee)
+            msg = self._build_msg(employee)
             
-            # Setup email
-            msg = MIMEMultipart()
-            msg['From'] = self.config['gmail_user']
-            msg['To'] = employee.email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'html'))
+            # Send email, reusing the batch connection when one is open
+            sent = False
+            if self._smtp is not None:
+                # smtplib connections are not thread-safe
+                with self._smtp_lock:
+                    # Another worker's failed reconnect may have dropped the connection
+                    if self._smtp is not None:
+                        try:
+                            self._smtp.send_message(msg)
+                        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+                            # Idle connections are dropped, or closed with a 421 reply
+                            if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421:
+                                raise
+                            self._close_smtp()
+                            self._smtp = self._smtp_connect()
+                            self._smtp.send_message(msg)
+                        sent = True
             
-            # Send email
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.starttls()
-                server.login(self.config['gmail_user'], self.config['gmail_password'])
-                server.send_message(msg)
+            if not sent:
+                with self._smtp_connect() as server:
+                    server.send_message(msg)
             
             self.logger.info(f"Welcome email sent to {employee.name}")
             return True
@@ -120,68 +511,67 @@ class OnboardingAssistant:
             self.logger.error(f"Error sending email to {employee.name}: {str(e)}")
             return False
     
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _dept_template(department: str, manager: str) -> str:
+        """Render the welcome template for a department/manager cohort"""
+        return OnboardingAssistant.WELCOME_HTML.format(
+            name='{{NAME}}',
+            start_date='{{START_DATE}}',
+            department=department,
+            manager=manager
+        )
+    
     def generate_welcome_email_body(self, employee: Employee) -> str:
         """Generate personalized welcome email content"""
-        return f"""
-        <html>
-        <body>
-            <h2>Welcome to Our Team, {employee.name}!</h2>
-            
-            <p>We're excited to have you join the <strong>{employee.department}</strong> department.</p>
-            
-            <h3>Your Details:</h3>
-            <ul>
-                <li><strong>Start Date:</strong> {employee.start_date}</li>
-                <li><strong>Department:</strong> {employee.department}</li>
-                <li><strong>Manager:</strong> {employee.manager}</li>
-            </ul>
-            
-            <h3>Next Steps:</h3>
-            <ol>
-                <li>Your manager will contact you within 24 hours</li>
-                <li>HR will send you onboarding documents</li>
-                <li>IT will setup your accounts and equipment</li>
-            </ol>
-            
-            <p>If you have any questions, please don't hesitate to reach out!</p>
-            
-            <p>Best regards,<br>
-            HR Team</p>
-        </body>
-        </html>
-        """
+        return (
+            self._dept_template(employee.department, employee.manager)
+            .replace('{{NAME}}', employee.name)
+            .replace('{{START_DATE}}', employee.start_date)
+        )
     
-    def notify_slack_team(self, employee: Employee) -> bool:
-        """Send team notification to Slack channel"""
-        try:
-            message = {
-                "text": f"🎉 New Team Member Alert!",
-                "attachments": [
-                    {
-                        "color": "good",
-                        "fields": [
-                            {"title": "Name", "value": employee.name, "short": True},
-                            {"title": "Department", "value": employee.department, "short": True},
-                            {"title": "Start Date", "value": employee.start_date, "short": True},
-                            {"title": "Manager", "value": employee.manager, "short": True}
-                        ]
-                    }
-                ]
-            }
-            
-            response = requests.post(
-                self.config['slack_webhook'],
-                json=message,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            
-            self.logger.info(f"Slack notification sent for {employee.name}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error sending Slack notification: {str(e)}")
-            return False
+    def notify_slack_team(self, employees: EmployeeTable) -> List[bool]:
+        """Send team notifications to Slack, reporting which employees were announced"""
+        if len(employees) == 1:
+            text = "🎉 New Team Member Alert!"
+        else:
+            text = f"🎉 {len(employees)} New Team Members Alert!"
+        
+        rows = list(zip(
+            employees.names, employees.departments, employees.start_dates, employees.managers
+        ))
+        announced = []
+        
+        # Slack rejects messages with too many attachments, so post in chunks
+        for start in range(0, len(rows), self.SLACK_MAX_ATTACHMENTS):
+            chunk = rows[start:start + self.SLACK_MAX_ATTACHMENTS]
+            try:
+                attachments = b','.join(
+                    self.SLACK_ATTACHMENT_TPL % (
+                        _json_bytes(name),
+                        _json_bytes(department),
+                        _json_bytes(start_date),
+                        _json_bytes(manager)
+                    )
+                    for name, department, start_date, manager in chunk
+                )
+                body = b'{"text":%s,"attachments":[%s]}' % (_json_bytes(text), attachments)
+                
+                response = self.session.post(
+                    self.config['slack_webhook'],
+                    data=body,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=self.HTTP_TIMEOUT
+                )
+                response.raise_for_status()
+                announced.extend([True] * len(chunk))
+                
+            except Exception as e:
+                self.logger.error(f"Error sending Slack notification: {str(e)}")
+                announced.extend([False] * len(chunk))
+        
+        self.logger.info(f"Slack notification sent for {sum(announced)}/{len(employees)} new employees")
+        return announced
     
     def create_onboarding_checklist(self, employee: Employee) -> Dict:
         """Create onboarding checklist and tasks"""
@@ -200,8 +590,8 @@ class OnboardingAssistant:
         
         # Save checklist to file
         filename = f"checklist_{employee.name.replace(' ', '_').lower()}.json"
-        with open(filename, 'w') as f:
-            json.dump(checklist, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(_json_bytes(checklist, indent=True))
         
         self.logger.info(f"Onboarding checklist created for {employee.name}")
         return checklist
@@ -216,11 +606,29 @@ class OnboardingAssistant:
             "workflow_duration": "automated"
         }
         
-        with open('workflow_metrics.json', 'a') as f:
-            f.write(json.dumps(metrics) + '\n')
+        with open('workflow_metrics.json', 'ab') as f:
+            f.write(_json_bytes(metrics) + b'\n')
         
         self.logger.info(f"Workflow completed: {success_count}/{employees_processed} successful")
     
+    def _process_one(self, employee: Employee) -> bool:
+        """Run every onboarding step for one employee"""
+        self.logger.info(f"Processing onboarding for {employee.name}")
+        
+        try:
+            # Send welcome email
+            email_sent = self.send_welcome_email(employee)
+            
+            # Create onboarding checklist
+            self.create_onboarding_checklist(employee)
+            
+            return email_sent
+            
+        except Exception as e:
+            self.logger.error(f"Error processing {employee.name}: {str(e)}")
+        
+        return False
+    
     def run_onboarding_workflow(self):
         """Main workflow execution"""
         self.logger.info("Starting onboarding workflow...")
@@ -228,42 +636,88 @@ class OnboardingAssistant:
         # Step 1: Fetch new employees
         new_employees = self.fetch_new_employees()
         
+        # Skip the steps a previous run already completed for each employee
+        ledger = self._load_processed_ledger()
+        emailed, announced = ledger['emailed'], ledger['announced']
+        new_employees = new_employees.where(
+            lambda employee: self._ledger_key(employee) not in emailed
+            or self._ledger_key(employee) not in announced
+        )
+        
         if not new_employees:
             self.logger.info("No new employees found")
             return
         
-        success_count = 0
+        to_email = new_employees.where(lambda employee: self._ledger_key(employee) not in emailed)
+        to_announce = new_employees.where(lambda employee: self._ledger_key(employee) not in announced)
+        
+        # Step 2: Process employees concurrently over a shared SMTP session,
+        # posting the batched Slack notification alongside them
+        with self._smtp_session() if to_email else nullcontext():
+            max_workers = min(self.MAX_WORKERS, len(to_email) + 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                slack_future = executor.submit(self.notify_slack_team, to_announce) if to_announce else None
+                emails_sent = list(executor.map(self._process_one, to_email))
+                slack_sent = slack_future.result() if slack_future else []
+        
+        # Record each completed step so later runs neither repeat nor skip it
+        for employee, sent in zip(to_email, emails_sent):
+            if sent:
+                emailed.add(self._ledger_key(employee))
+        for employee, sent in zip(to_announce, slack_sent):
+            if sent:
+                announced.add(self._ledger_key(employee))
+        self._save_processed_ledger(ledger)
         
-        # Step 2: Process each employee
+        success_count = 0
         for employee in new_employees:
-            self.logger.info(f"Processing onboarding for {employee.name}")
-            
-            try:
-                # Send welcome email
-                email_sent = self.send_welcome_email(employee)
-                
-                # Notify team on Slack
-                slack_sent = self.notify_slack_team(employee)
-                
-                # Create onboarding checklist
-                checklist = self.create_onboarding_checklist(employee)
-                
-                if email_sent and slack_sent:
-                    success_count += 1
-                    self.logger.info(f"Successfully processed {employee.name}")
-                
-            except Exception as e:
-                self.logger.error(f"Error processing {employee.name}: {str(e)}")
+            key = self._ledger_key(employee)
+            if key in emailed and key in announced:
+                success_count += 1
+                self.logger.info(f"Successfully processed {employee.name}")
         
         # Step 3: Log metrics
         self.log_workflow_metrics(len(new_employees), success_count)
+    
+    def serve(self, interval_sec: int = 300):
+        """Run the workflow on a fixed interval, reusing connections between runs"""
+        self._keep_smtp_open = True
+        self.logger.info(f"Serving onboarding workflow every {interval_sec}s")
+        
+        # Turn SIGTERM into a normal exit so close() and the atexit log flush still run
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        
+        while True:
+            try:
+                self.run_onboarding_workflow()
+            except Exception:
+                self.logger.exception("Onboarding workflow run failed")
+            time.sleep(interval_sec)
 
 def main():
     """Main entry point for the onboarding assistant"""
+    interval = os.getenv('ONBOARDING_INTERVAL_SEC', '0')
+    try:
+        interval_sec = int(interval)
+    except ValueError:
+        raise SystemExit(f"ONBOARDING_INTERVAL_SEC must be a whole number of seconds, got {interval!r}")
+    
     assistant = OnboardingAssistant()
-    assistant.run_onboarding_workflow()
+    try:
+        if interval_sec > 0:
+            assistant.serve(interval_sec)
+        else:
+            assistant.run_onboarding_workflow()
+    finally:
+        assistant.close()
 
 if __name__ == "__main__":
+    # Real workflow: `--run` for a single pass, or ONBOARDING_INTERVAL_SEC to keep serving
+    if '--run' in sys.argv[1:] or os.getenv('ONBOARDING_INTERVAL_SEC'):
+        main()
+        sys.exit(0)
+    
     # Example usage with mock data for demonstration
     print("Employee Onboarding Assistant - API Integration Demo")
     print("=" * 50)
@@ -291,6 +745,7 @@ if __name__ == "__main__":
     print("\n📊 Logging workflow metrics...")
     assistant.log_workflow_metrics(1, 1)
     print("✅ Metrics logged")
+    assistant.close()
     
     print("\n🎉 Demo completed! Check generated files:")
     print("   - onboarding.log (workflow logs)")
@@ -300,4 +755,5 @@ if __name__ == "__main__":
     print("\n💡 To run with real APIs:")
     print("   1. Set environment variables for API keys")
     print("   2. Update Google Sheets with employee data")
-    print("   3. Run: python onboarding_assistant.py")
\ No newline at end of file
+    print("   3. Run: python onboarding_assistant.py --run")
+    print("      (set ONBOARDING_INTERVAL_SEC to keep it running on an interval)")
\ No newline at end of file